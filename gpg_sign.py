@@ -2,22 +2,87 @@
 
 import argparse
 import os
-import shutil
 import subprocess
 import sys
 import traceback
-from collections.abc import Iterator
-from contextlib import contextmanager, suppress
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
 
-GPG_SIGN_VERSION = "0.3.0"
+GPG_SIGN_VERSION = "0.4.0"
+
+# Root directory for staged release assets.
+DIST_ROOT = Path("dist")
+
+# Environment variables passed through to `gpg` subprocesses.
+#
+# `gpg` needs little more than a way to find itself, its home directory, and
+# the `gpg-agent` socket within it. The locale variables set the language of
+# `gpg`'s messages and the encoding of its output. The remaining entries are
+# required for processes to start and locate the GnuPG home directory on
+# Windows runners.
+SUBPROCESS_ENV_ALLOWLIST = (
+    "PATH",
+    "HOME",
+    "GNUPGHOME",
+    # Locale
+    "LANG",
+    "LC_ALL",
+    "LC_CTYPE",
+    # Windows
+    "SYSTEMROOT",
+    "USERPROFILE",
+    "APPDATA",
+    "LOCALAPPDATA",
+    "TEMP",
+    "TMP",
+)
+
+# GitHub Actions default environment variables emitted as workflow metadata.
+#
+# https://docs.github.com/en/actions/learn-github-actions/variables#default-environment-variables
+WORKFLOW_METADATA_FIELDS = (
+    ("GitHub Repository", "GITHUB_REPOSITORY"),
+    ("GitHub Actor", "GITHUB_ACTOR"),
+    ("GitHub Workflow", "GITHUB_WORKFLOW"),
+    ("GitHub Job", "GITHUB_JOB"),
+    ("GitHub Run ID", "GITHUB_RUN_ID"),
+    ("GitHub Ref", "GITHUB_REF"),
+    ("GitHub Ref Name", "GITHUB_REF_NAME"),
+    ("GitHub SHA", "GITHUB_SHA"),
+)
 
 
 @dataclass(frozen=True, kw_only=True)
 class Args:
-    artifact: Path
+    artifacts: list[Path]
     release: str
+    debug: bool
+
+
+class MissingSigningKeyError(Exception):
+    def __init__(self: "MissingSigningKeyError") -> None:
+        super().__init__(
+            f"GPG secret key for signing identity {signing_identity()} not found"
+        )
+
+
+def subprocess_env() -> dict[str, str]:
+    """
+    Minimal environment for subprocesses spawned by this script.
+
+    CI runners export hundreds of environment variables which are of no use to
+    `gpg`; see `SUBPROCESS_ENV_ALLOWLIST`.
+    """
+
+    env = os.environ
+    return {
+        key: value
+        for key in SUBPROCESS_ENV_ALLOWLIST
+        if (value := env.get(key)) is not None
+    }
 
 
 def run_command_with_merged_output(command: list[str]) -> None:
@@ -26,7 +91,44 @@ def run_command_with_merged_output(command: list[str]) -> None:
     streams.
 
     This is useful for funnelling all output of a command into a GitHub Actions
-    log group.
+    log group. Output is relayed to stdout as the command produces it rather
+    than being buffered until the command exits.
+
+    This command raises `subprocess.CalledProcessError` if the command exits
+    with a non-zero status, like `check=True` does with `subprocess.run`.
+    """
+
+    # Flush any pending text output (like a log group header) so it is not
+    # reordered after bytes written directly to the underlying buffer.
+    sys.stdout.flush()
+
+    with subprocess.Popen(
+        command,
+        env=subprocess_env(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=0,
+    ) as proc:
+        if proc.stdout is not None:
+            # Relay raw bytes in whatever chunks the pipe yields so each read
+            # costs a single write instead of a decode and `print` per line.
+            fd = proc.stdout.fileno()
+            while chunk := os.read(fd, 64 * 1024):
+                sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, command)
+
+
+def run_command_with_captured_output(command: list[str]) -> str:
+    """
+    Run the given command as a subprocess and return its merged stdout and
+    stderr streams.
+
+    This is useful for running commands concurrently and funnelling the output
+    of each command into its own GitHub Actions log group once it completes.
 
     This command uses `check=True` when delegating to `subprocess`.
     """
@@ -34,13 +136,13 @@ def run_command_with_merged_output(command: list[str]) -> None:
     proc = subprocess.run(
         command,
         check=True,
+        env=subprocess_env(),
+        stdin=subprocess.DEVNULL,
         stdout=subprocess.PIPE,
         stderr=subprocess.STDOUT,
         text=True,
     )
-    for line in proc.stdout.splitlines():
-        if line:
-            print(line)
+    return proc.stdout
 
 
 def set_output(*, name: str, value: str) -> None:
@@ -52,8 +154,8 @@ def set_output(*, name: str, value: str) -> None:
     """
 
     if github_output := os.getenv("GITHUB_OUTPUT"):
-        with Path(github_output).open("a") as out:
-            print(f"{name}={value}", file=out)
+        with Path(github_output).open("a", encoding="utf-8") as out:
+            out.write(f"{name}={value}\n")
 
 
 @contextmanager
@@ -71,26 +173,35 @@ def log_group(group: str) -> Iterator[None]:
         print("::endgroup::")
 
 
+def print_log_groups(groups: Iterable[tuple[str, str]]) -> None:
+    """
+    Print the captured output of concurrent commands, each in its own log group.
+
+    Groups are emitted in the given order as each output becomes available, so
+    the output of concurrent `gpg` processes is never interleaved.
+    """
+
+    for group, output in groups:
+        with log_group(group):
+            if output:
+                sys.stdout.write(output.rstrip("\n") + "\n")
+
+
 def emit_metadata() -> None:
-    if os.getenv("CI") != "true":
+    env = os.environ
+    if env.get("CI") != "true":
+        return
+
+    lines = [
+        f"{label}: {value}"
+        for label, key in WORKFLOW_METADATA_FIELDS
+        if (value := env.get(key))
+    ]
+    if not lines:
         return
+
     with log_group("Workflow metadata"):
-        if repository := os.getenv("GITHUB_REPOSITORY"):
-            print(f"GitHub Repository: {repository}")
-        if actor := os.getenv("GITHUB_ACTOR"):
-            print(f"GitHub Actor: {actor}")
-        if workflow := os.getenv("GITHUB_WORKFLOW"):
-            print(f"GitHub Workflow: {workflow}")
-        if job := os.getenv("GITHUB_JOB"):
-            print(f"GitHub Job: {job}")
-        if run_id := os.getenv("GITHUB_RUN_ID"):
-            print(f"GitHub Run ID: {run_id}")
-        if ref := os.getenv("GITHUB_REF"):
-            print(f"GitHub Ref: {ref}")
-        if ref_name := os.getenv("GITHUB_REF_NAME"):
-            print(f"GitHub Ref Name: {ref_name}")
-        if sha := os.getenv("GITHUB_SHA"):
-            print(f"GitHub SHA: {sha}")
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def signing_identity() -> str:
@@ -101,51 +212,185 @@ def signing_identity() -> str:
     return "1C4A856ACF86EC1EE841180FAF57A37CAC061452"
 
 
-def gpg_sign_artifact(*, artifact: Path, release_name: str) -> Path:
-    """
-    Create a GPG signature for the given artifact.
-    """
-
-    stage = Path("dist").joinpath(release_name)
-    with log_group(f"Create GPG signature [{artifact.name}]"):
-        with suppress(FileNotFoundError):
-            shutil.rmtree(stage)
-        stage.mkdir(parents=True)
-
-        asc = stage.joinpath(f"{artifact.name}.asc")
-        run_command_with_merged_output(
-            [
-                "gpg",
-                "--batch",
-                "--yes",
-                "--detach-sign",
-                "-vv",
-                "--armor",
-                "--local-user",
-                signing_identity(),
-                "--output",
-                str(asc),
-                str(artifact),
-            ]
+def launch_gpg_agent() -> None:
+    """
+    Start a long-lived `gpg-agent` before any signing work begins.
+
+    All `gpg` invocations in this script pass `--no-autostart` and connect to
+    this agent instead of each paying for an agent cold start.
+    """
+
+    with log_group("Launch gpg-agent"):
+        run_command_with_merged_output(["gpgconf", "--launch", "gpg-agent"])
+
+
+def check_signing_key() -> None:
+    """
+    Ensure the secret key for the signing identity is available to `gpg`.
+
+    This check runs once before any artifacts are signed so a runner without the
+    signing key imported fails fast instead of failing once per artifact.
+
+    Failures other than a missing secret key, like an unreachable `gpg-agent` or
+    an unreadable keyring, are raised as `CalledProcessError` with `gpg`'s
+    output attached.
+
+    `gpg` runs in the C locale for this check so a missing key is recognized by
+    its untranslated error message on runners with a localized environment.
+    """
+
+    with log_group("Check GPG signing key"):
+        command = [
+            "gpg",
+            "--batch",
+            "--no-autostart",
+            "--with-colons",
+            "--list-secret-keys",
+            signing_identity(),
+        ]
+        proc = subprocess.run(
+            command,
+            check=False,
+            env={**subprocess_env(), "LC_ALL": "C"},
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            if "No secret key" in proc.stderr:
+                raise MissingSigningKeyError
+            raise subprocess.CalledProcessError(
+                proc.returncode, command, output=proc.stdout, stderr=proc.stderr
+            )
+
+        print(f"Found secret key for signing identity {signing_identity()}")
+
+
+def gpg_verbosity(*, debug: bool) -> list[str]:
+    """
+    Verbosity flags to pass to `gpg`.
+
+    `gpg -vv` emits packet-level diagnostics which are only useful when
+    debugging signing failures.
+    """
+
+    return ["-vv"] if debug else []
+
+
+def gpg_detach_sign(*, artifact: Path, asc: Path, debug: bool) -> str:
+    """
+    Create a detached GPG signature for the given artifact at the given path.
+
+    Returns the merged output of the `gpg` invocation.
+
+    This script shells out to `gpg` rather than signing in-process because it
+    must run with only the standard library: release jobs invoke it with the
+    runner's system Python without installing dependencies, and the signing key
+    is only available through the `gpg-agent` configured by the workflow.
+    """
+
+    return run_command_with_captured_output(
+        [
+            "gpg",
+            "--batch",
+            "--no-autostart",
+            "--yes",
+            "--detach-sign",
+            *gpg_verbosity(debug=debug),
+            "--armor",
+            "--local-user",
+            signing_identity(),
+            "--output",
+            os.fspath(asc),
+            os.fspath(artifact),
+        ]
+    )
+
+
+def gpg_sign_artifacts(
+    *, artifacts: list[Path], release_name: str, debug: bool
+) -> list[Path]:
+    """
+    Create a GPG signature for each of the given artifacts.
+
+    Artifacts are signed concurrently. The bulk of the work of creating a
+    signature is hashing the artifact, which `gpg` does in its own process; only
+    the final private key operation is delegated to the shared `gpg-agent`.
+
+    Returns a list of paths to the detached signatures in the same order as the
+    given artifacts.
+    """
+
+    stage = DIST_ROOT / release_name
+    stage.mkdir(parents=True, exist_ok=True)
+
+    signatures = [stage / f"{artifact.name}.asc" for artifact in artifacts]
+    # Remove stale signatures from a previous run so a failed signing attempt
+    # cannot leave one behind to be uploaded.
+    for asc in signatures:
+        asc.unlink(missing_ok=True)
+
+    max_workers = min(os.cpu_count() or 1, len(artifacts))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outputs = executor.map(
+            lambda artifact, asc: gpg_detach_sign(
+                artifact=artifact, asc=asc, debug=debug
+            ),
+            artifacts,
+            signatures,
+        )
+        print_log_groups(
+            (f"Create GPG signature [{artifact.name}]", output)
+            for artifact, output in zip(artifacts, outputs, strict=True)
         )
 
-        return asc
+    return signatures
+
+
+def gpg_verify(*, artifact: Path, asc: Path, debug: bool) -> str:
+    """
+    Verify the detached GPG signature at the given path for the given artifact.
+
+    Returns the merged output of the `gpg` invocation.
+    """
+
+    return run_command_with_captured_output(
+        [
+            "gpg",
+            "--batch",
+            "--no-autostart",
+            "--verify",
+            *gpg_verbosity(debug=debug),
+            os.fspath(asc),
+            os.fspath(artifact),
+        ]
+    )
 
 
-def validate(*, artifact: Path, asc: Path) -> None:
+def validate(*, artifacts: list[Path], signatures: list[Path], debug: bool) -> None:
     """
-    Verify GPG signature for the given artifact.
+    Verify GPG signatures for the given artifacts.
+
+    Like signing, verification is dominated by `gpg` hashing each artifact, so
+    signatures are verified concurrently.
     """
 
-    with log_group("Verify GPG signature"):
-        run_command_with_merged_output(
-            ["gpg", "--batch", "--verify", "-vv", str(asc), str(artifact)]
+    max_workers = min(os.cpu_count() or 1, len(artifacts))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        outputs = executor.map(
+            lambda artifact, asc: gpg_verify(artifact=artifact, asc=asc, debug=debug),
+            artifacts,
+            signatures,
+        )
+        print_log_groups(
+            (f"Verify GPG signature [{artifact.name}]", output)
+            for artifact, output in zip(artifacts, outputs, strict=True)
         )
 
 
 def parse_args() -> Args:
     parser = argparse.ArgumentParser(
-        description="Compute a GPG signature for an artifact"
+        description="Compute GPG signatures for one or more artifacts"
     )
     parser.add_argument(
         "-a",
@@ -153,7 +398,12 @@ def parse_args() -> Args:
         action="append",
         required=True,
         type=Path,
-        help="path to artifact to sign",
+        help="path to artifact to sign, may be given multiple times",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="emit verbose gpg diagnostics",
     )
     parser.add_argument(
         "-v",
@@ -167,20 +417,30 @@ def parse_args() -> Args:
     if not args.artifact:
         raise ValueError("must provide an artifact to compute a signature for")
 
-    artifact, *rest = args.artifact
-
-    if rest:
-        raise ValueError("too many artifacts provided")
-
-    if not artifact.is_file():
-        raise ValueError(f"artifact file {artifact} does not exist")
+    for artifact in args.artifact:
+        if not artifact.is_file():
+            raise ValueError(f"artifact file {artifact} does not exist")
+
+    # Signatures are written to `dist/<release>/<artifact name>.asc`, so two
+    # artifacts with the same file name would clobber each other's signature.
+    seen_paths: set[Path] = set()
+    seen_names: set[str] = set()
+    for artifact in args.artifact:
+        resolved = artifact.resolve()
+        if resolved in seen_paths:
+            raise ValueError(f"artifact file {artifact} was given more than once")
+        if artifact.name in seen_names:
+            raise ValueError(f"multiple artifacts are named {artifact.name}")
+        seen_paths.add(resolved)
+        seen_names.add(artifact.name)
 
     if not args.release:
         raise ValueError("release name must be provided")
 
     return Args(
-        artifact=artifact,
+        artifacts=args.artifact,
         release=args.release,
+        debug=args.debug,
     )
 
 
@@ -190,10 +450,17 @@ def main() -> int:
 
         args = parse_args()
 
-        signature = gpg_sign_artifact(artifact=args.artifact, release_name=args.release)
-        validate(artifact=args.artifact, asc=signature)
+        launch_gpg_agent()
+        check_signing_key()
+
+        signatures = gpg_sign_artifacts(
+            artifacts=args.artifacts, release_name=args.release, debug=args.debug
+        )
+        validate(artifacts=args.artifacts, signatures=signatures, debug=args.debug)
 
-        set_output(name="signature", value=str(signature))
+        # `ncipollo/release-action` accepts a comma-delimited list of paths in
+        # its `artifacts` input.
+        set_output(name="signature", value=",".join(str(asc) for asc in signatures))
     except subprocess.CalledProcessError as e:
         print("Error: failed to invoke command", file=sys.stderr)
         print(f"    Command: {e.cmd}", file=sys.stderr)